@@ -0,0 +1,121 @@
+"""Configuration loading module."""
+
+import tomllib
+from dataclasses import MISSING, dataclass, field, fields
+from pathlib import Path
+from typing import TypeVar
+
+T = TypeVar("T")
+
+
+@dataclass
+class TranslationConfig:
+    """Translation settings."""
+
+    model: str
+    max_tokens: int = 2048
+    temperature: float = 0.3
+
+
+@dataclass
+class NotificationConfig:
+    """Notification settings."""
+
+    max_message_length: int = 1800
+
+
+@dataclass
+class RepositoryConfig:
+    """A monitored repository."""
+
+    name: str
+    owner: str
+    repo: str
+    file: str
+    branch: str = "main"
+    enabled: bool = True
+
+
+@dataclass
+class Config:
+    """Top-level configuration."""
+
+    translation: TranslationConfig
+    notification: NotificationConfig = field(default_factory=NotificationConfig)
+    repositories: list[RepositoryConfig] = field(default_factory=list)
+
+
+def load_config(config_path: str) -> Config:
+    """Load and validate the TOML configuration file.
+
+    Args:
+        config_path: Path to config file
+
+    Returns:
+        Validated configuration
+
+    Raises:
+        OSError: If the file cannot be read
+        tomllib.TOMLDecodeError: If the file is not valid TOML
+        ValueError: If a field is missing, unknown or of the wrong type
+    """
+    data = tomllib.loads(Path(config_path).read_text(encoding="utf-8"))
+
+    unknown = sorted(set(data) - {f.name for f in fields(Config)})
+    if unknown:
+        raise ValueError(f"unknown top-level keys {unknown}")
+
+    repositories = data.get("repositories", [])
+    if not isinstance(repositories, list):
+        raise ValueError("repositories must be an array of tables")
+
+    return Config(
+        translation=_build(TranslationConfig, data.get("translation"), "translation"),
+        notification=_build(NotificationConfig, data.get("notification", {}), "notification"),
+        repositories=[
+            _build(RepositoryConfig, entry, f"repositories[{i}]")
+            for i, entry in enumerate(repositories)
+        ],
+    )
+
+
+def _build(cls: type[T], data: object, where: str) -> T:
+    """Build a config dataclass from a TOML table, checking keys and types.
+
+    Args:
+        cls: Dataclass to build
+        data: Parsed TOML table
+        where: Location used in error messages
+
+    Returns:
+        Instance of cls
+
+    Raises:
+        ValueError: If the table does not match the dataclass
+    """
+    if not isinstance(data, dict):
+        raise ValueError(f"{where} must be a table")
+
+    known = {f.name: f for f in fields(cls)}
+    unknown = sorted(set(data) - set(known))
+    if unknown:
+        raise ValueError(f"{where}: unknown keys {unknown}")
+
+    for name, f in known.items():
+        if name not in data:
+            if f.default is MISSING and f.default_factory is MISSING:
+                raise ValueError(f"{where}: missing required key '{name}'")
+            continue
+
+        value = data[name]
+        # TOML integers are fine where a float is expected, but bool is not an int here
+        if f.type is float:
+            valid = isinstance(value, (int, float)) and not isinstance(value, bool)
+        elif f.type is int:
+            valid = isinstance(value, int) and not isinstance(value, bool)
+        else:
+            valid = isinstance(value, f.type)
+        if not valid:
+            raise ValueError(f"{where}.{name} must be {f.type.__name__}, got {type(value).__name__}")
+
+    return cls(**data)
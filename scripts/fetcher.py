@@ -1,9 +1,32 @@
 """GitHub CHANGELOG fetcher module."""
 
+import hashlib
 import logging
+from dataclasses import dataclass
 from typing import Optional
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Change detection only, so a fast non-SHA2 digest is enough
+HASH_ALGO = "blake2b"
+
+
+@dataclass
+class FetchResult:
+    """Result of fetching a CHANGELOG file."""
+
+    content: Optional[str]
+    status_code: int
+    content_hash: Optional[str] = None
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+    @property
+    def not_modified(self) -> bool:
+        """Whether the server answered 304 Not Modified."""
+        return self.status_code == 304
 
 
 class Fetcher:
@@ -18,13 +41,30 @@ class Fetcher:
         self.timeout = timeout
         self.logger = logging.getLogger(__name__)
 
+        # Reuse connections to raw.githubusercontent.com across repositories
+        self.session = requests.Session()
+        self.session.mount(
+            "https://",
+            HTTPAdapter(
+                pool_connections=20,
+                pool_maxsize=20,
+                max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[502, 503, 504]),
+            ),
+        )
+
+    def close(self) -> None:
+        """Close the underlying HTTP session."""
+        self.session.close()
+
     def fetch_changelog(
         self,
         owner: str,
         repo: str,
         file_path: str,
         branch: str = "main",
-    ) -> Optional[str]:
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+    ) -> Optional[FetchResult]:
         """Fetch CHANGELOG content from GitHub.
 
         Args:
@@ -32,24 +72,54 @@ class Fetcher:
             repo: Repository name
             file_path: Path to the file (e.g., CHANGELOG.md)
             branch: Branch name
+            etag: ETag from the previous fetch, sent as If-None-Match
+            last_modified: Last-Modified from the previous fetch, sent as If-Modified-Since
 
         Returns:
-            File content as string, or None if failed
+            FetchResult (content is None on 304 Not Modified), or None if failed
         """
         url = f"https://raw.githubusercontent.com/{owner}/{repo}/{branch}/{file_path}"
 
+        headers = {}
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+
         try:
             self.logger.info(f"Fetching {owner}/{repo}/{file_path} from branch {branch}")
-            response = requests.get(url, timeout=self.timeout)
-
-            if response.status_code == 404:
-                self.logger.warning(f"File not found: {url}")
-                return None
-
-            response.raise_for_status()
-            content = response.text
-            self.logger.info(f"Successfully fetched {len(content)} characters")
-            return content
+            with self.session.get(url, headers=headers, stream=True, timeout=self.timeout) as response:
+                if response.status_code == 304:
+                    self.logger.info("Not modified since last fetch (304)")
+                    return FetchResult(
+                        content=None,
+                        status_code=304,
+                        etag=response.headers.get("ETag", etag),
+                        last_modified=response.headers.get("Last-Modified", last_modified),
+                    )
+
+                if response.status_code == 404:
+                    self.logger.warning(f"File not found: {url}")
+                    return None
+
+                response.raise_for_status()
+
+                # Hash while streaming so the body is only buffered once
+                hasher = hashlib.blake2b(digest_size=32)
+                buffer = bytearray()
+                for chunk in response.iter_content(64 * 1024):
+                    hasher.update(chunk)
+                    buffer += chunk
+
+                content = buffer.decode("utf-8", errors="replace")
+                self.logger.info(f"Successfully fetched {len(content)} characters")
+                return FetchResult(
+                    content=content,
+                    status_code=response.status_code,
+                    content_hash=hasher.hexdigest(),
+                    etag=response.headers.get("ETag"),
+                    last_modified=response.headers.get("Last-Modified"),
+                )
 
         except requests.exceptions.Timeout:
             self.logger.error(f"Timeout while fetching {url}")
@@ -75,32 +145,37 @@ class Fetcher:
             Diff text containing newly added lines
         """
         if previous is None:
-            # First run: return first max_lines
-            lines = current.split("\n")
-            result = "\n".join(lines[:max_lines])
-            self.logger.info(f"First run: extracted {min(len(lines), max_lines)} lines")
+            # First run: return first max_lines without splitting the rest of the file
+            lines = current.split("\n", max_lines)[:max_lines]
+            result = "\n".join(lines)
+            self.logger.info(f"First run: extracted {len(lines)} lines")
             return result
 
         # Extract new lines from the beginning
         current_lines = current.split("\n")
         previous_lines = previous.split("\n")
 
-        # Find where they diverge
-        diff_lines = []
-        for i, line in enumerate(current_lines):
-            if i >= len(previous_lines) or line != previous_lines[i]:
-                diff_lines.append(line)
-            else:
-                # Once we find a matching line at the same position,
-                # we've found where the old content starts
+        # Skip the common head (e.g. a "# Changelog" title)
+        prefix = 0
+        for current_line, previous_line in zip(current_lines, previous_lines):
+            if current_line != previous_line:
                 break
-
-        # Limit to max_lines
-        result_lines = diff_lines[:max_lines]
+            prefix += 1
+
+        # Skip the common tail: new entries are prepended, so the previous
+        # content survives intact at the end of the current file
+        limit = min(len(current_lines), len(previous_lines)) - prefix
+        suffix = 0
+        while suffix < limit and current_lines[-1 - suffix] == previous_lines[-1 - suffix]:
+            suffix += 1
+
+        # Slice straight to at most max_lines instead of copying the whole new region
+        total_new = len(current_lines) - suffix - prefix
+        result_lines = current_lines[prefix : prefix + min(total_new, max_lines)]
         result = "\n".join(result_lines)
 
-        if diff_lines:
-            self.logger.info(f"Extracted {len(result_lines)} new lines (total new: {len(diff_lines)})")
+        if total_new:
+            self.logger.info(f"Extracted {len(result_lines)} new lines (total new: {total_new})")
         else:
             self.logger.info("No differences found")
 
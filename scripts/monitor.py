@@ -1,23 +1,31 @@
 """Main monitoring script for CHANGELOG updates."""
 
+import gzip
 import hashlib
 import json
 import logging
 import os
+import re
 import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Optional
 
-import yaml
 from dotenv import load_dotenv
 
 load_dotenv()
 
-from fetcher import Fetcher
+from config import Config, RepositoryConfig, load_config
+from fetcher import HASH_ALGO, Fetcher
 from notifier import Notifier
 from translator import Translator
 
+# Branch names and file paths may contain "/", which cannot appear in a snapshot file name
+_UNSAFE_FILENAME_RE = re.compile(r"[^A-Za-z0-9._-]")
+
 
 class SnapshotManager:
     """Manages snapshots of CHANGELOG files."""
@@ -32,43 +40,171 @@ class SnapshotManager:
         self.snapshots_dir.mkdir(exist_ok=True)
         self.logger = logging.getLogger(__name__)
 
-    def get_snapshot_path(self, owner: str, repo: str) -> Path:
+        # Snapshots already read or written during this run
+        self._snapshots: dict[tuple[str, str, str, str], dict] = {}
+
+        # Per-snapshot locks so parallel workers never interleave writes
+        self._locks: dict[tuple[str, str, str, str], threading.Lock] = {}
+        # Per-repository locks: every entry of a repository may claim its legacy snapshot
+        self._migration_locks: dict[tuple[str, str], threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+
+    def _lock_for(self, owner: str, repo: str, file_path: str, branch: str) -> threading.Lock:
+        """Get the write lock for a monitored file's snapshot.
+
+        Args:
+            owner: Repository owner
+            repo: Repository name
+            file_path: File path
+            branch: Branch name
+
+        Returns:
+            Lock guarding the snapshot file
+        """
+        with self._locks_guard:
+            return self._locks.setdefault((owner, repo, file_path, branch), threading.Lock())
+
+    def _snapshot_stem(self, owner: str, repo: str, file_path: str, branch: str) -> str:
+        """Build the file name stem shared by a snapshot's files.
+
+        Args:
+            owner: Repository owner
+            repo: Repository name
+            file_path: File path
+            branch: Branch name
+
+        Returns:
+            File name stem, safe to use as a single path component
+        """
+        readable = _UNSAFE_FILENAME_RE.sub("_", f"{owner}_{repo}_{branch}_{file_path}")
+        # Sanitizing can map different keys (e.g. "release/1.0" and "release_1.0")
+        # to the same name, so a hash of the exact key keeps them apart
+        key = "\0".join((owner, repo, branch, file_path))
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=6).hexdigest()
+        return f"{readable}_{digest}"
+
+    def get_snapshot_path(self, owner: str, repo: str, file_path: str, branch: str) -> Path:
         """Get the path to a snapshot file.
 
         Args:
             owner: Repository owner
             repo: Repository name
+            file_path: File path
+            branch: Branch name
 
         Returns:
             Path to the snapshot file
         """
-        filename = f"{owner}_{repo}_CHANGELOG.json"
+        filename = f"{self._snapshot_stem(owner, repo, file_path, branch)}.json"
+        return self.snapshots_dir / filename
+
+    def get_content_path(self, owner: str, repo: str, file_path: str, branch: str) -> Path:
+        """Get the path to the compressed copy of the last seen content.
+
+        Args:
+            owner: Repository owner
+            repo: Repository name
+            file_path: File path
+            branch: Branch name
+
+        Returns:
+            Path to the gzipped content file
+        """
+        filename = f"{self._snapshot_stem(owner, repo, file_path, branch)}.txt.gz"
         return self.snapshots_dir / filename
 
-    def load_snapshot(self, owner: str, repo: str) -> Optional[dict]:
+    def load_content(self, owner: str, repo: str, file_path: str, branch: str) -> Optional[str]:
+        """Load the content saved with the last snapshot.
+
+        Args:
+            owner: Repository owner
+            repo: Repository name
+            file_path: File path
+            branch: Branch name
+
+        Returns:
+            Previous file content or None if not stored
+        """
+        path = self.get_content_path(owner, repo, file_path, branch)
+        if not path.exists():
+            return None
+
+        try:
+            return gzip.decompress(path.read_bytes()).decode("utf-8")
+        except Exception as e:
+            self.logger.error(f"Error loading previous content: {e}")
+            return None
+
+    def load_snapshot(self, owner: str, repo: str, file_path: str, branch: str) -> Optional[dict]:
         """Load existing snapshot.
 
         Args:
             owner: Repository owner
             repo: Repository name
+            file_path: File path
+            branch: Branch name
 
         Returns:
             Snapshot data or None if doesn't exist
         """
-        path = self.get_snapshot_path(owner, repo)
+        key = (owner, repo, file_path, branch)
+        cached = self._snapshots.get(key)
+        if cached is not None:
+            return cached
+
+        path = self.get_snapshot_path(owner, repo, file_path, branch)
         if not path.exists():
-            self.logger.info(f"No snapshot found for {owner}/{repo}")
+            self._migrate_legacy_snapshot(owner, repo, file_path, branch)
+        if not path.exists():
+            self.logger.info(f"No snapshot found for {owner}/{repo}/{file_path} ({branch})")
             return None
 
         try:
             with open(path, "r", encoding="utf-8") as f:
                 snapshot = json.load(f)
-            self.logger.info(f"Loaded snapshot for {owner}/{repo}")
+            self._snapshots[key] = snapshot
+            self.logger.info(f"Loaded snapshot for {owner}/{repo}/{file_path} ({branch})")
             return snapshot
         except Exception as e:
             self.logger.error(f"Error loading snapshot: {e}")
             return None
 
+    def _migrate_legacy_snapshot(self, owner: str, repo: str, file_path: str, branch: str) -> None:
+        """Rename a snapshot from the old {owner}_{repo}_CHANGELOG naming.
+
+        The old files did not encode branch or file, so they are only adopted
+        by the entry whose branch and file match those recorded inside. Entries
+        of the same repository run in parallel, so the check and rename happen
+        under a per-repository lock.
+
+        Args:
+            owner: Repository owner
+            repo: Repository name
+            file_path: File path
+            branch: Branch name
+        """
+        legacy_path = self.snapshots_dir / f"{owner}_{repo}_CHANGELOG.json"
+        with self._locks_guard:
+            lock = self._migration_locks.setdefault((owner, repo), threading.Lock())
+
+        with lock:
+            if not legacy_path.exists():
+                return
+
+            try:
+                with open(legacy_path, "r", encoding="utf-8") as f:
+                    recorded = json.load(f).get("repository", {})
+                if recorded.get("file") != file_path or recorded.get("branch") != branch:
+                    return
+
+                legacy_content_path = self.snapshots_dir / f"{owner}_{repo}_CHANGELOG.txt.gz"
+                if legacy_content_path.exists():
+                    os.replace(legacy_content_path, self.get_content_path(owner, repo, file_path, branch))
+                os.replace(legacy_path, self.get_snapshot_path(owner, repo, file_path, branch))
+                self.logger.info(f"Migrated legacy snapshot for {owner}/{repo}/{file_path} ({branch})")
+            except Exception as e:
+                self.logger.error(f"Error migrating legacy snapshot: {e}")
+
     def save_snapshot(
         self,
         owner: str,
@@ -76,6 +212,9 @@ class SnapshotManager:
         file_path: str,
         branch: str,
         content: str,
+        content_hash: str,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
     ) -> None:
         """Save snapshot.
 
@@ -85,7 +224,11 @@ class SnapshotManager:
             file_path: File path
             branch: Branch name
             content: File content
+            content_hash: Hash of the content, computed by the Fetcher with HASH_ALGO
+            etag: ETag header of the fetched file
+            last_modified: Last-Modified header of the fetched file
         """
+        now_iso = datetime.now(timezone.utc).isoformat(timespec="seconds")
         snapshot = {
             "repository": {
                 "owner": owner,
@@ -93,52 +236,103 @@ class SnapshotManager:
                 "file": file_path,
                 "branch": branch,
             },
-            "content_hash": self.calculate_hash(content),
-            "last_updated": datetime.now(timezone.utc).isoformat(),
-            "last_checked": datetime.now(timezone.utc).isoformat(),
+            "content_hash": content_hash,
+            "hash_algo": HASH_ALGO,
+            "etag": etag,
+            "last_modified": last_modified,
+            "last_updated": now_iso,
+            "last_checked": now_iso,
         }
 
-        path = self.get_snapshot_path(owner, repo)
+        path = self.get_snapshot_path(owner, repo, file_path, branch)
         try:
-            with open(path, "w", encoding="utf-8") as f:
-                json.dump(snapshot, f, indent=2, ensure_ascii=False)
-            self.logger.info(f"Saved snapshot for {owner}/{repo}")
+            with self._lock_for(owner, repo, file_path, branch):
+                self._write_atomic(
+                    self.get_content_path(owner, repo, file_path, branch),
+                    gzip.compress(content.encode("utf-8"), compresslevel=6, mtime=0),
+                )
+                self._write_json(path, snapshot)
+                self._snapshots[(owner, repo, file_path, branch)] = snapshot
+            self.logger.info(f"Saved snapshot for {owner}/{repo}/{file_path} ({branch})")
         except Exception as e:
             self.logger.error(f"Error saving snapshot: {e}")
 
-    def calculate_hash(self, content: str) -> str:
-        """Calculate SHA256 hash of content.
+    def _write_json(self, path: Path, data: dict) -> None:
+        """Write JSON atomically so a crash never leaves a truncated snapshot.
 
         Args:
-            content: Content to hash
+            path: Destination path
+            data: Data to serialize
+        """
+        self._write_atomic(path, json.dumps(data, indent=2, ensure_ascii=False).encode("utf-8"))
 
-        Returns:
-            Hex digest of the hash
+    def _write_atomic(self, path: Path, data: bytes) -> None:
+        """Write bytes via a temporary file and os.replace.
+
+        Args:
+            path: Destination path
+            data: Bytes to write
         """
-        return hashlib.sha256(content.encode("utf-8")).hexdigest()
+        tmp_path = path.with_name(path.name + ".tmp")
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
 
-    def update_last_checked(self, owner: str, repo: str) -> None:
+    def update_last_checked(
+        self,
+        owner: str,
+        repo: str,
+        file_path: str,
+        branch: str,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+    ) -> None:
         """Update the last_checked timestamp.
 
+        Reuses the snapshot loaded earlier in the run instead of re-reading the file.
+
         Args:
             owner: Repository owner
             repo: Repository name
+            file_path: File path
+            branch: Branch name
+            etag: Latest ETag header, stored if given
+            last_modified: Latest Last-Modified header, stored if given
         """
-        snapshot = self.load_snapshot(owner, repo)
-        if snapshot:
-            snapshot["last_checked"] = datetime.now(timezone.utc).isoformat()
-            path = self.get_snapshot_path(owner, repo)
-            try:
-                with open(path, "w", encoding="utf-8") as f:
-                    json.dump(snapshot, f, indent=2, ensure_ascii=False)
-            except Exception as e:
-                self.logger.error(f"Error updating last_checked: {e}")
+        with self._lock_for(owner, repo, file_path, branch):
+            snapshot = self.load_snapshot(owner, repo, file_path, branch)
+            if snapshot:
+                snapshot["last_checked"] = datetime.now(timezone.utc).isoformat(timespec="seconds")
+                if etag:
+                    snapshot["etag"] = etag
+                if last_modified:
+                    snapshot["last_modified"] = last_modified
+                path = self.get_snapshot_path(owner, repo, file_path, branch)
+                try:
+                    self._write_json(path, snapshot)
+                except Exception as e:
+                    self.logger.error(f"Error updating last_checked: {e}")
+
+
+@dataclass
+class PendingChange:
+    """A detected CHANGELOG update awaiting translation and notification."""
+
+    name: str
+    owner: str
+    repo: str
+    file_path: str
+    branch: str
+    content: str
+    content_hash: str
+    diff: str
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
 
 
 class ChangelogMonitor:
     """Main monitoring class."""
 
-    def __init__(self, config_path: str = "config/repositories.yml"):
+    def __init__(self, config_path: str = "config/repositories.toml"):
         """Initialize the monitor.
 
         Args:
@@ -152,26 +346,25 @@ class ChangelogMonitor:
         try:
             self.fetcher = Fetcher()
             self.translator = Translator(
-                model_name=self.config["translation"]["model"],
-                temperature=self.config["translation"]["temperature"],
+                model_name=self.config.translation.model,
+                temperature=self.config.translation.temperature,
             )
             self.notifier = Notifier()
         except ValueError as e:
             self.logger.error(f"Initialization error: {e}")
             sys.exit(1)
 
-    def _load_config(self, config_path: str) -> dict:
+    def _load_config(self, config_path: str) -> Config:
         """Load configuration file.
 
         Args:
             config_path: Path to config file
 
         Returns:
-            Configuration dictionary
+            Validated configuration
         """
         try:
-            with open(config_path, "r", encoding="utf-8") as f:
-                config = yaml.safe_load(f)
+            config = load_config(config_path)
             self.logger.info(f"Loaded configuration from {config_path}")
             return config
         except Exception as e:
@@ -182,29 +375,64 @@ class ChangelogMonitor:
         """Run the monitoring process."""
         self.logger.info("=== Changelog Monitor Started ===")
 
-        repositories = self.config.get("repositories", [])
+        repositories = self.config.repositories
         if not repositories:
             self.logger.warning("No repositories configured")
             return
 
-        stats = {"total": 0, "success": 0, "no_changes": 0, "failed": 0}
+        stats = {"total": len(repositories), "success": 0, "no_changes": 0, "failed": 0}
 
+        enabled = []
         for repo_config in repositories:
-            stats["total"] += 1
-
             # Check if enabled
-            if not repo_config.get("enabled", True):
-                self.logger.info(f"Skipping disabled repository: {repo_config['name']}")
+            if not repo_config.enabled:
+                self.logger.info(f"Skipping disabled repository: {repo_config.name}")
                 continue
+            enabled.append(repo_config)
 
-            try:
-                self._process_repository(repo_config)
-                stats["success"] += 1
-            except NoChangesError:
-                stats["no_changes"] += 1
-            except Exception as e:
-                self.logger.error(f"Failed to process {repo_config['name']}: {e}")
-                stats["failed"] += 1
+        try:
+            changes: list[PendingChange] = []
+            if enabled:
+                # Overlap network latency across repositories
+                with ThreadPoolExecutor(max_workers=min(16, len(enabled))) as executor:
+                    futures = {
+                        executor.submit(self._check_repository, repo_config): repo_config
+                        for repo_config in enabled
+                    }
+                    for future in as_completed(futures):
+                        repo_config = futures[future]
+                        try:
+                            changes.append(future.result())
+                        except NoChangesError:
+                            stats["no_changes"] += 1
+                        except Exception as e:
+                            self.logger.error(f"Failed to process {repo_config.name}: {e}")
+                            stats["failed"] += 1
+
+            if changes:
+                # Identical diffs (e.g. one repository watched on several branches)
+                # are translated once per run
+                unique: dict[str, PendingChange] = {}
+                for change in changes:
+                    unique.setdefault(self._diff_key(change.diff), change)
+
+                # Translate every changed repository in a single Gemini request
+                translations = self.translator.translate_batch(
+                    [(change.name, change.diff) for change in unique.values()]
+                )
+                translated_cache: dict[str, str] = dict(zip(unique, translations))
+                self.logger.info("🌐 Translation completed")
+
+                for change in changes:
+                    try:
+                        self._publish_change(change, translated_cache[self._diff_key(change.diff)])
+                        stats["success"] += 1
+                    except Exception as e:
+                        self.logger.error(f"Failed to process {change.name}: {e}")
+                        stats["failed"] += 1
+        finally:
+            self.fetcher.close()
+            self.notifier.close()
 
         # Print summary
         self.logger.info("\n=== Summary ===")
@@ -213,73 +441,158 @@ class ChangelogMonitor:
         self.logger.info(f"No changes: {stats['no_changes']}")
         self.logger.info(f"Failed: {stats['failed']}")
 
-    def _process_repository(self, repo_config: dict) -> None:
-        """Process a single repository.
+    def _diff_key(self, diff: str) -> str:
+        """Key identifying a diff's text within a run.
+
+        Args:
+            diff: Extracted diff
+
+        Returns:
+            Hex digest of the diff
+        """
+        return hashlib.blake2b(diff.encode("utf-8"), digest_size=32).hexdigest()
+
+    def _check_repository(self, repo_config: RepositoryConfig) -> PendingChange:
+        """Check a single repository for CHANGELOG updates.
 
         Args:
             repo_config: Repository configuration
 
+        Returns:
+            The detected change, ready to be translated
+
         Raises:
             NoChangesError: If no changes detected
             Exception: If processing fails
         """
-        name = repo_config["name"]
-        owner = repo_config["owner"]
-        repo = repo_config["repo"]
-        file_path = repo_config["file"]
-        branch = repo_config.get("branch", "main")
+        name = repo_config.name
+        owner = repo_config.owner
+        repo = repo_config.repo
+        file_path = repo_config.file
+        branch = repo_config.branch
 
         self.logger.info(f"\nChecking: {name}")
 
-        # Fetch current content
-        current_content = self.fetcher.fetch_changelog(owner, repo, file_path, branch)
-        if current_content is None:
+        # Load snapshot
+        snapshot = self.snapshot_manager.load_snapshot(owner, repo, file_path, branch)
+
+        # Fetch current content (conditional GET when we have validators)
+        result = self.fetcher.fetch_changelog(
+            owner,
+            repo,
+            file_path,
+            branch,
+            etag=snapshot.get("etag") if snapshot else None,
+            last_modified=snapshot.get("last_modified") if snapshot else None,
+        )
+        if result is None:
             raise Exception("Failed to fetch CHANGELOG")
 
-        # Load snapshot
-        snapshot = self.snapshot_manager.load_snapshot(owner, repo)
+        if result.not_modified:
+            self.logger.info(f"  ⏭️  No changes detected for {name} (304)")
+            self.snapshot_manager.update_last_checked(
+                owner, repo, file_path, branch, result.etag, result.last_modified
+            )
+            raise NoChangesError()
 
-        # Check for changes
-        current_hash = self.snapshot_manager.calculate_hash(current_content)
+        current_content = result.content
 
-        if snapshot and snapshot.get("content_hash") == current_hash:
-            self.logger.info("  ⏭️  No changes detected")
-            self.snapshot_manager.update_last_checked(owner, repo)
+        # Check for changes (hash computed while streaming the response)
+        if snapshot and snapshot.get("content_hash") == result.content_hash:
+            self.logger.info(f"  ⏭️  No changes detected for {name}")
+            self.snapshot_manager.update_last_checked(
+                owner, repo, file_path, branch, result.etag, result.last_modified
+            )
             raise NoChangesError()
 
-        self.logger.info("  ✅ Changes detected")
-
-        # Extract diff
+        # Snapshots written before hash_algo existed used SHA-256; any other
+        # unknown algorithm is simply treated as a change
+        if snapshot and snapshot.get("hash_algo", "sha256") == "sha256":
+            legacy_hash = hashlib.sha256(current_content.encode("utf-8")).hexdigest()
+            if snapshot.get("content_hash") == legacy_hash:
+                self.logger.info(f"  ⏭️  No changes detected for {name} (migrating snapshot to {HASH_ALGO})")
+                self.snapshot_manager.save_snapshot(
+                    owner,
+                    repo,
+                    file_path,
+                    branch,
+                    current_content,
+                    result.content_hash,
+                    etag=result.etag,
+                    last_modified=result.last_modified,
+                )
+                raise NoChangesError()
+
+        self.logger.info(f"  ✅ Changes detected for {name}")
+
+        # Extract diff against the content stored with the last snapshot
         previous_content = None
         if snapshot:
-            # We don't store the full content, so we'll treat this as a full update
-            # In a production system, you might want to store the previous content
-            pass
+            previous_content = self.snapshot_manager.load_content(owner, repo, file_path, branch)
 
         diff = self.fetcher.extract_diff(current_content, previous_content)
         if not diff.strip():
-            self.logger.info("  ⏭️  No meaningful diff")
-            self.snapshot_manager.update_last_checked(owner, repo)
+            # Deletions or whitespace-only edits: adopt the new content as the
+            # baseline without notifying, so later diffs are not taken against stale text
+            self.logger.info(f"  ⏭️  No meaningful diff for {name}")
+            self.snapshot_manager.save_snapshot(
+                owner,
+                repo,
+                file_path,
+                branch,
+                current_content,
+                result.content_hash,
+                etag=result.etag,
+                last_modified=result.last_modified,
+            )
             raise NoChangesError()
 
-        self.logger.info(f"  📝 Diff extracted ({len(diff.split(chr(10)))} lines)")
+        self.logger.info(f"  📝 Diff extracted for {name} ({diff.count(chr(10)) + 1} lines)")
+
+        return PendingChange(
+            name=name,
+            owner=owner,
+            repo=repo,
+            file_path=file_path,
+            branch=branch,
+            content=current_content,
+            content_hash=result.content_hash,
+            diff=diff,
+            etag=result.etag,
+            last_modified=result.last_modified,
+        )
+
+    def _publish_change(self, change: PendingChange, translated: str) -> None:
+        """Send the notification for a change and save its snapshot.
 
-        # Translate
-        translated = self.translator.translate(diff, name)
-        self.logger.info("  🌐 Translation completed")
+        Args:
+            change: Detected change
+            translated: Translated diff
 
+        Raises:
+            Exception: If the notification fails
+        """
         # Send notification
-        repo_url = f"https://github.com/{owner}/{repo}/blob/{branch}/{file_path}"
-        success = self.notifier.send(name, translated, repo_url)
+        repo_url = f"https://github.com/{change.owner}/{change.repo}/blob/{change.branch}/{change.file_path}"
+        success = self.notifier.send(change.name, translated, repo_url)
 
         if success:
-            self.logger.info("  📤 Discord notification sent")
+            self.logger.info(f"  📤 Discord notification sent for {change.name}")
         else:
             raise Exception("Failed to send notification")
 
         # Save snapshot
-        self.snapshot_manager.save_snapshot(owner, repo, file_path, branch, current_content)
-        self.logger.info("  💾 Snapshot updated")
+        self.snapshot_manager.save_snapshot(
+            change.owner,
+            change.repo,
+            change.file_path,
+            change.branch,
+            change.content,
+            change.content_hash,
+            etag=change.etag,
+            last_modified=change.last_modified,
+        )
+        self.logger.info(f"  💾 Snapshot updated for {change.name}")
 
 
 class NoChangesError(Exception):
@@ -5,6 +5,8 @@ import os
 from typing import Optional
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 
 class Notifier:
@@ -24,6 +26,21 @@ class Notifier:
         self.timeout = timeout
         self.logger = logging.getLogger(__name__)
 
+        # Reuse the connection to the webhook host across notifications
+        self.session = requests.Session()
+        self.session.mount(
+            "https://",
+            HTTPAdapter(
+                pool_connections=20,
+                pool_maxsize=20,
+                max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[502, 503, 504]),
+            ),
+        )
+
+    def close(self) -> None:
+        """Close the underlying HTTP session."""
+        self.session.close()
+
     def send(self, repo_name: str, translated_text: str, repo_url: str) -> bool:
         """Send notification to Discord.
 
@@ -50,7 +67,7 @@ class Notifier:
 
         try:
             self.logger.info(f"Sending notification for {repo_name}")
-            response = requests.post(
+            response = self.session.post(
                 self.webhook_url,
                 json=payload,
                 timeout=self.timeout,
@@ -97,17 +114,27 @@ class Notifier:
         if len(text) <= max_length:
             return text
 
-        # Try to truncate at a newline
+        # Try to truncate at a newline, then at a space, within the last 30%
         truncated = text[:max_length]
-        last_newline = truncated.rfind("\n")
-
-        if last_newline > max_length * 0.7:  # If newline is in the last 30%
-            truncated = truncated[:last_newline]
-        else:
-            # Try to truncate at a space
-            last_space = truncated.rfind(" ")
-            if last_space > max_length * 0.7:
-                truncated = truncated[:last_space]
+        break_at = self._find_break(truncated, int(max_length * 0.7) + 1)
+        if break_at != -1:
+            truncated = truncated[:break_at]
 
         suffix = "...(続きはリンク先で)"
         return truncated + suffix
+
+    def _find_break(self, text: str, min_idx: int) -> int:
+        """Find the last line break (preferred) or space at or after min_idx.
+
+        Args:
+            text: Text to search
+            min_idx: Lowest acceptable index
+
+        Returns:
+            Index of the break character, or -1 if none
+        """
+        # Bounded rfind only scans the acceptable zone, not the whole message
+        last_newline = text.rfind("\n", min_idx)
+        if last_newline != -1:
+            return last_newline
+        return text.rfind(" ", min_idx)
@@ -1,13 +1,44 @@
 """Gemini API translator module."""
 
+import hashlib
+import json
 import logging
 import os
+import re
 import time
+from pathlib import Path
 from typing import Optional
 
 from google import genai
 from google.genai import types
 
+# Spans that must reach the reader untouched: code fences, inline code, URLs, versions
+_PROTECTED_RE = re.compile(r"```.*?```|`[^`\n]+`|https?://[^\s)\]>]+|\bv?\d+\.\d+\.\d+\b", re.DOTALL)
+_PLACEHOLDER_RE = re.compile(r"⟦C(\d+)⟧")
+
+# Everything that is not prose: code fences, markdown headers, URLs, bullet markers
+_NON_PROSE_RE = re.compile(r"```.*?```|^[ \t]*#[^\n]*|https?://\S+|^[ \t]*[-*+][ \t]+", re.DOTALL | re.MULTILINE)
+# Diffs with less prose than this (e.g. a bare "## v1.2.4") are not worth a request
+_MIN_PROSE_CHARS = 20
+
+_TRANSLATION_RULES = """【翻訳ルール】
+1. 技術的に正確に翻訳する
+2. 以下は英語のまま保持:
+   - バージョン番号 (v2.0.74等)
+   - API名、SDK名、CLI名
+   - コマンド、関数名、クラス名
+   - ファイル名、パス
+   - URL
+   - コードブロック内のテキスト
+3. 日本語として自然な表現にする
+4. 箇条書きの構造は保持する
+5. マークダウン記法は保持する
+6. ⟦C0⟧ のようなプレースホルダーは変更・削除せずそのまま出力する"""
+
+# Fixed parts of the single-repository prompt; only the name and text vary
+_PROMPT_PREFIX = "あなたは技術文書の翻訳専門家です。\n以下のルールに従って、"
+_PROMPT_TAIL = f"のCHANGELOG差分を日本語に翻訳してください。\n\n{_TRANSLATION_RULES}\n\n【翻訳対象】\n"
+
 
 class Translator:
     """Translates technical documents using Gemini API."""
@@ -17,6 +48,8 @@ class Translator:
         api_key: Optional[str] = None,
         model_name: str = "gemini-2.0-flash-exp",
         temperature: float = 0.3,
+        cache_dir: str = ".cache/translator",
+        cache_size_limit: int = 100 * 1024 * 1024,
     ):
         """Initialize the Translator.
 
@@ -24,6 +57,9 @@ class Translator:
             api_key: Gemini API key (defaults to GEMINI_API_KEY env var)
             model_name: Model name to use
             temperature: Temperature parameter for generation
+            cache_dir: Directory to cache translations keyed by prompt
+            cache_size_limit: Maximum total cache size in bytes; least recently
+                used entries are evicted beyond it
         """
         self.api_key = api_key or os.getenv("GEMINI_API_KEY")
         if not self.api_key:
@@ -33,6 +69,9 @@ class Translator:
         self.temperature = temperature
         self.logger = logging.getLogger(__name__)
 
+        self.cache_dir = Path(cache_dir)
+        self.cache_size_limit = cache_size_limit
+
         # Initialize Gemini client
         self.client = genai.Client(api_key=self.api_key)
 
@@ -49,49 +88,264 @@ class Translator:
         if not text.strip():
             return text
 
-        prompt = self._build_prompt(text, repo_name)
+        if self._is_trivial(text):
+            self.logger.info(f"Trivial diff for {repo_name}, skipping translation")
+            return text
+
+        masked, protected = self._mask(text)
+        prompt = self._build_prompt(masked, repo_name)
+
+        cached = self._cache_get(prompt)
+        if cached is not None:
+            self.logger.info(f"Using cached translation for {repo_name}")
+            return self._unmask(cached, protected)
 
         try:
             self.logger.info(f"Translating {len(text)} characters for {repo_name}")
-            response = self.client.models.generate_content(
-                model=self.model_name,
-                contents=prompt,
-                config=types.GenerateContentConfig(
+            response_text = self._generate(
+                prompt,
+                types.GenerateContentConfig(
                     temperature=self.temperature,
                     max_output_tokens=2048,
                 ),
             )
-
-            translated = response.text.strip()
+            self._cache_set(prompt, response_text.strip())
+            translated = self._unmask(response_text.strip(), protected)
             self.logger.info(f"Translation completed: {len(translated)} characters")
             return translated
+        except Exception as e:
+            self.logger.error(f"Translation error: {e}")
+            return f"[翻訳失敗] {text}"
+
+    def translate_batch(self, items: list[tuple[str, str]]) -> list[str]:
+        """Translate several repositories' diffs with a single request.
+
+        Items are keyed by position, so repositories sharing a display name
+        never overwrite each other.
+
+        Args:
+            items: (repo_name, text) pairs
+
+        Returns:
+            Translated text in Japanese, in the same order as items
+        """
+        results = [text for _, text in items]
+        masked_items = {}
+        protected_items = {}
+        for index, (name, text) in enumerate(items):
+            if not text.strip() or self._is_trivial(text):
+                continue
+
+            masked, protected = self._mask(text)
+            cached = self._cache_get(self._build_prompt(masked, name))
+            if cached is not None:
+                self.logger.info(f"Using cached translation for {name}")
+                results[index] = self._unmask(cached, protected)
+            else:
+                masked_items[index], protected_items[index] = masked, protected
+
+        if len(masked_items) <= 1:
+            for index in masked_items:
+                name, text = items[index]
+                results[index] = self.translate(text, name)
+            return results
+
+        prompt = self._build_batch_prompt(
+            {str(index): (items[index][0], masked) for index, masked in masked_items.items()}
+        )
+
+        try:
+            self.logger.info(f"Translating {len(masked_items)} repositories in one request")
+            response_text = self._generate(
+                prompt,
+                types.GenerateContentConfig(
+                    temperature=self.temperature,
+                    max_output_tokens=min(8192, 2048 * len(masked_items)),
+                    response_mime_type="application/json",
+                    response_schema={
+                        "type": "OBJECT",
+                        "properties": {str(index): {"type": "STRING"} for index in masked_items},
+                        "required": [str(index) for index in masked_items],
+                    },
+                ),
+            )
+            translations = json.loads(response_text)
+            if not isinstance(translations, dict):
+                self.logger.error(f"Batch translation returned {type(translations).__name__}, not an object")
+                translations = {}
+        except Exception as e:
+            self.logger.error(f"Batch translation error: {e}")
+            translations = {}
+
+        for index, masked in masked_items.items():
+            name, text = items[index]
+            translated = translations.get(str(index))
+            if isinstance(translated, str) and translated.strip():
+                self._cache_set(self._build_prompt(masked, name), translated.strip())
+                results[index] = self._unmask(translated.strip(), protected_items[index])
+            else:
+                # Fall back to a dedicated request for anything the batch missed
+                results[index] = self.translate(text, name)
+
+        self.logger.info(f"Batch translation completed for {len(masked_items)} repositories")
+        return results
+
+    def _cache_path(self, prompt: str) -> Path:
+        """Get the cache file for a prompt.
+
+        Args:
+            prompt: Single-repository prompt
+
+        Returns:
+            Path to the cache entry
+        """
+        key = hashlib.blake2b(
+            f"{self.model_name}|{self.temperature}|{prompt}".encode("utf-8"), digest_size=32
+        ).hexdigest()
+        return self.cache_dir / f"{key}.txt"
+
+    def _cache_get(self, prompt: str) -> Optional[str]:
+        """Look up a cached translation.
+
+        Args:
+            prompt: Single-repository prompt
+
+        Returns:
+            Cached (still masked) translation, or None on a miss
+        """
+        path = self._cache_path(prompt)
+        try:
+            translated = path.read_text(encoding="utf-8")
+            # Refresh mtime so eviction drops the least recently used entries
+            os.utime(path)
+            return translated
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            self.logger.warning(f"Error reading translation cache: {e}")
+            return None
+
+    def _cache_set(self, prompt: str, translated: str) -> None:
+        """Store a translation in the cache.
+
+        Args:
+            prompt: Single-repository prompt
+            translated: Masked translation returned by Gemini
+        """
+        path = self._cache_path(prompt)
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_name(path.name + ".tmp")
+            tmp_path.write_text(translated, encoding="utf-8")
+            os.replace(tmp_path, path)
+            self._prune_cache()
+        except Exception as e:
+            self.logger.warning(f"Error writing translation cache: {e}")
+
+    def _prune_cache(self) -> None:
+        """Evict the least recently used entries once the cache exceeds its size limit."""
+        entries = [(path.stat(), path) for path in self.cache_dir.glob("*.txt")]
+        total = sum(stat.st_size for stat, _ in entries)
+        if total <= self.cache_size_limit:
+            return
+
+        for stat, path in sorted(entries, key=lambda entry: entry[0].st_mtime):
+            path.unlink(missing_ok=True)
+            total -= stat.st_size
+            if total <= self.cache_size_limit:
+                break
+        self.logger.info("Pruned translation cache")
+
+    def _generate(self, prompt: str, config: types.GenerateContentConfig) -> str:
+        """Call Gemini, retrying once on rate limiting.
+
+        Args:
+            prompt: Prompt to send
+            config: Generation config
+
+        Returns:
+            Response text
 
+        Raises:
+            Exception: If the request (or its retry) fails
+        """
+        try:
+            response = self.client.models.generate_content(
+                model=self.model_name,
+                contents=prompt,
+                config=config,
+            )
+            return response.text
         except Exception as e:
             error_msg = str(e)
 
             # Handle rate limiting
-            if "429" in error_msg or "quota" in error_msg.lower():
-                self.logger.warning("Rate limit hit, waiting 3 seconds and retrying...")
-                time.sleep(3)
-                try:
-                    response = self.client.models.generate_content(
-                        model=self.model_name,
-                        contents=prompt,
-                        config=types.GenerateContentConfig(
-                            temperature=self.temperature,
-                            max_output_tokens=2048,
-                        ),
-                    )
-                    translated = response.text.strip()
-                    self.logger.info("Retry successful")
-                    return translated
-                except Exception as retry_error:
-                    self.logger.error(f"Retry failed: {retry_error}")
-                    return f"[翻訳失敗] {text}"
-
-            # Other errors
-            self.logger.error(f"Translation error: {e}")
-            return f"[翻訳失敗] {text}"
+            if "429" not in error_msg and "quota" not in error_msg.lower():
+                raise
+
+            self.logger.warning("Rate limit hit, waiting 3 seconds and retrying...")
+            time.sleep(3)
+            response = self.client.models.generate_content(
+                model=self.model_name,
+                contents=prompt,
+                config=config,
+            )
+            self.logger.info("Retry successful")
+            return response.text
+
+    def _is_trivial(self, text: str) -> bool:
+        """Check whether text has too little prose to need translation.
+
+        Args:
+            text: Text to translate
+
+        Returns:
+            True if the text is only headers, code, URLs and bullet markers
+        """
+        prose = _NON_PROSE_RE.sub("", text)
+        return len(prose.strip()) < _MIN_PROSE_CHARS
+
+    def _mask(self, text: str) -> tuple[str, list[str]]:
+        """Replace non-translatable spans with placeholders.
+
+        Args:
+            text: Text to translate
+
+        Returns:
+            Masked text and the original spans, indexed by placeholder number
+        """
+        protected: list[str] = []
+
+        def replace(match: re.Match) -> str:
+            protected.append(match.group(0))
+            return f"⟦C{len(protected) - 1}⟧"
+
+        return _PROTECTED_RE.sub(replace, text), protected
+
+    def _unmask(self, text: str, protected: list[str]) -> str:
+        """Restore the spans replaced by _mask.
+
+        Args:
+            text: Translated text containing placeholders
+            protected: Original spans from _mask
+
+        Returns:
+            Translated text with the original spans restored
+        """
+        restored = 0
+
+        def replace(match: re.Match) -> str:
+            nonlocal restored
+            index = int(match.group(1))
+            if index >= len(protected):
+                return match.group(0)
+            restored += 1
+            return protected[index]
+
+        result = _PLACEHOLDER_RE.sub(replace, text)
+        if restored < len(protected):
+            self.logger.warning(f"Translation dropped {len(protected) - restored} protected spans")
+        return result
 
     def _build_prompt(self, text: str, repo_name: str) -> str:
         """Build translation prompt.
@@ -103,21 +357,25 @@ class Translator:
         Returns:
             Formatted prompt
         """
+        return "".join((_PROMPT_PREFIX, repo_name, _PROMPT_TAIL, text))
+
+    def _build_batch_prompt(self, items: dict[str, tuple[str, str]]) -> str:
+        """Build a prompt translating several repositories at once.
+
+        Args:
+            items: (repo_name, text) pairs keyed by item number
+
+        Returns:
+            Formatted prompt
+        """
+        targets = {key: {"repository": name, "text": text} for key, (name, text) in items.items()}
         return f"""あなたは技術文書の翻訳専門家です。
-以下のルールに従って、{repo_name}のCHANGELOG差分を日本語に翻訳してください。
+以下のルールに従って、複数リポジトリのCHANGELOG差分を日本語に翻訳してください。
 
-【翻訳ルール】
-1. 技術的に正確に翻訳する
-2. 以下は英語のまま保持:
-   - バージョン番号 (v2.0.74等)
-   - API名、SDK名、CLI名
-   - コマンド、関数名、クラス名
-   - ファイル名、パス
-   - URL
-   - コードブロック内のテキスト
-3. 日本語として自然な表現にする
-4. 箇条書きの構造は保持する
-5. マークダウン記法は保持する
+{_TRANSLATION_RULES}
+
+【出力形式】
+翻訳対象と同じ番号をキー、各"text"の翻訳結果を値とするJSONオブジェクトのみを出力する
 
 【翻訳対象】
-{text}"""
+{json.dumps(targets, ensure_ascii=False, indent=2)}"""
@@ -0,0 +1,81 @@
+"""Tests for config.load_config."""
+
+import pytest
+
+from config import load_config
+
+VALID = """
+[translation]
+model = "gemini-2.0-flash-lite"
+temperature = 0.3
+
+[[repositories]]
+name = "Claude Code"
+owner = "anthropics"
+repo = "claude-code"
+file = "CHANGELOG.md"
+"""
+
+
+@pytest.fixture
+def write_config(tmp_path):
+    def write(text):
+        path = tmp_path / "repositories.toml"
+        path.write_text(text, encoding="utf-8")
+        return str(path)
+
+    return write
+
+
+def test_loads_valid_config_with_defaults(write_config):
+    config = load_config(write_config(VALID))
+
+    assert config.translation.model == "gemini-2.0-flash-lite"
+    assert config.translation.max_tokens == 2048
+    assert config.notification.max_message_length == 1800
+    repo = config.repositories[0]
+    assert (repo.owner, repo.repo, repo.file) == ("anthropics", "claude-code", "CHANGELOG.md")
+    assert repo.branch == "main"
+    assert repo.enabled is True
+
+
+def test_loads_shipped_config():
+    config = load_config("config/repositories.toml")
+
+    assert config.repositories
+
+
+def test_integer_accepted_for_float(write_config):
+    config = load_config(write_config(VALID.replace("temperature = 0.3", "temperature = 1")))
+
+    assert config.translation.temperature == 1
+
+
+def test_missing_required_key(write_config):
+    with pytest.raises(ValueError, match=r"repositories\[0\]: missing required key 'owner'"):
+        load_config(write_config(VALID.replace('owner = "anthropics"\n', "")))
+
+
+def test_missing_translation_table(write_config):
+    with pytest.raises(ValueError, match="translation must be a table"):
+        load_config(write_config("[[repositories]]" + VALID.split("[[repositories]]")[1]))
+
+
+def test_unknown_key_in_table(write_config):
+    with pytest.raises(ValueError, match=r"translation: unknown keys \['foo'\]"):
+        load_config(write_config(VALID.replace("temperature = 0.3", "temperature = 0.3\nfoo = 1")))
+
+
+def test_unknown_top_level_key(write_config):
+    with pytest.raises(ValueError, match=r"unknown top-level keys \['foo'\]"):
+        load_config(write_config("foo = 1\n" + VALID))
+
+
+def test_wrong_type(write_config):
+    with pytest.raises(ValueError, match=r"repositories\[0\]\.enabled must be bool, got str"):
+        load_config(write_config(VALID + 'enabled = "yes"\n'))
+
+
+def test_bool_rejected_for_int(write_config):
+    with pytest.raises(ValueError, match=r"notification\.max_message_length must be int"):
+        load_config(write_config(VALID + "[notification]\nmax_message_length = true\n"))
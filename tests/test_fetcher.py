@@ -0,0 +1,172 @@
+"""Tests for Fetcher."""
+
+import hashlib
+
+import pytest
+import requests
+
+from fetcher import Fetcher
+
+
+@pytest.fixture
+def fetcher():
+    return Fetcher()
+
+
+def test_first_run_returns_head(fetcher):
+    content = "\n".join(f"line {i}" for i in range(100))
+
+    result = fetcher.extract_diff(content, None, max_lines=3)
+
+    assert result == "line 0\nline 1\nline 2"
+
+
+def test_first_run_shorter_than_max_lines(fetcher):
+    assert fetcher.extract_diff("a\nb", None, max_lines=5) == "a\nb"
+
+
+def test_prepended_release_below_title(fetcher):
+    previous = "# Changelog\n\n## 1.0.0\n\n- a\n- b\n"
+    current = "# Changelog\n\n## 1.0.1\n\n- c\n\n## 1.0.0\n\n- a\n- b\n"
+
+    result = fetcher.extract_diff(current, previous)
+
+    assert result.strip() == "## 1.0.1\n\n- c"
+
+
+def test_prepended_release_without_title(fetcher):
+    previous = "## 1.0\n- old a\n"
+    current = "## 1.1\n- new\n\n## 1.0\n- old a\n"
+
+    result = fetcher.extract_diff(current, previous)
+
+    assert result.strip() == "## 1.1\n- new"
+
+
+def test_blank_lines_do_not_cut_the_diff_short(fetcher):
+    previous = "## 1.0\n\n- a\n"
+    current = "## 1.1\n\n- b\n\n- c\n\n## 1.0\n\n- a\n"
+
+    result = fetcher.extract_diff(current, previous)
+
+    assert result.strip() == "## 1.1\n\n- b\n\n- c"
+
+
+def test_identical_content_has_no_diff(fetcher):
+    content = "## 1.0\n- a\n"
+
+    assert fetcher.extract_diff(content, content) == ""
+
+
+def test_deleted_line_has_no_diff(fetcher):
+    previous = "## 1.0\n- old a\n- old b"
+    current = "## 1.0\n- old a"
+
+    assert fetcher.extract_diff(current, previous) == ""
+
+
+def test_whitespace_only_change_has_no_meaningful_diff(fetcher):
+    previous = "## 1.0\n- a\n"
+    current = "## 1.0\n- a\n\n"
+
+    assert fetcher.extract_diff(current, previous).strip() == ""
+
+
+def test_release_after_deletion_diffed_against_new_baseline(fetcher):
+    # After a deletion the monitor adopts the new content as the baseline,
+    # so the next release must only yield the new lines
+    baseline = "## 1.0\n- old a"
+    current = "## 1.1\n- new\n\n## 1.0\n- old a"
+
+    assert fetcher.extract_diff(current, baseline) == "## 1.1\n- new\n"
+
+
+def test_max_lines_caps_new_region(fetcher):
+    previous = "## 1.0\n- a"
+    new_lines = [f"- new {i}" for i in range(10)]
+    current = "\n".join(["## 1.1", *new_lines, "", previous])
+
+    result = fetcher.extract_diff(current, previous, max_lines=3)
+
+    assert result == "## 1.1\n- new 0\n- new 1"
+
+
+class StubResponse:
+    """Just enough of requests.Response for a streamed fetch."""
+
+    def __init__(self, status_code, body=b"", headers=None):
+        self.status_code = status_code
+        self.body = body
+        self.headers = headers or {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.exceptions.HTTPError(f"{self.status_code} error")
+
+    def iter_content(self, chunk_size):
+        for start in range(0, len(self.body), chunk_size):
+            yield self.body[start : start + chunk_size]
+
+
+class StubSession:
+    """Returns a canned response and records the request headers."""
+
+    def __init__(self, response):
+        self.response = response
+        self.requests = []
+
+    def get(self, url, headers=None, stream=False, timeout=None):
+        self.requests.append({"url": url, "headers": headers or {}, "stream": stream})
+        return self.response
+
+
+def test_sends_validators_and_handles_not_modified(fetcher):
+    fetcher.session = StubSession(StubResponse(304, headers={"ETag": '"v2"'}))
+
+    result = fetcher.fetch_changelog(
+        "o", "r", "CHANGELOG.md", etag='"v1"', last_modified="Mon, 01 Jan 2024 00:00:00 GMT"
+    )
+
+    assert fetcher.session.requests[0]["headers"] == {
+        "If-None-Match": '"v1"',
+        "If-Modified-Since": "Mon, 01 Jan 2024 00:00:00 GMT",
+    }
+    assert result.not_modified
+    assert result.content is None
+    assert result.etag == '"v2"'
+    # Validators the 304 did not repeat are carried over
+    assert result.last_modified == "Mon, 01 Jan 2024 00:00:00 GMT"
+
+
+def test_first_fetch_sends_no_validators(fetcher):
+    fetcher.session = StubSession(StubResponse(200, b"## 1.0\n"))
+
+    result = fetcher.fetch_changelog("o", "r", "CHANGELOG.md")
+
+    assert fetcher.session.requests[0]["headers"] == {}
+    assert not result.not_modified
+
+
+def test_missing_file_returns_none(fetcher):
+    fetcher.session = StubSession(StubResponse(404))
+
+    assert fetcher.fetch_changelog("o", "r", "CHANGELOG.md") is None
+
+
+def test_streamed_body_is_hashed_whole(fetcher):
+    # Larger than one 64 KiB chunk, with a multi-byte character on a chunk boundary
+    body = ("a" * (64 * 1024 - 1) + "é\n" + "## 1.0\n" * 20000).encode("utf-8")
+    fetcher.session = StubSession(StubResponse(200, body, {"ETag": '"v1"', "Last-Modified": "Tue"}))
+
+    result = fetcher.fetch_changelog("o", "r", "CHANGELOG.md")
+
+    assert fetcher.session.requests[0]["stream"]
+    assert result.content == body.decode("utf-8")
+    assert result.content_hash == hashlib.blake2b(body, digest_size=32).hexdigest()
+    assert (result.etag, result.last_modified) == ('"v1"', "Tue")
@@ -0,0 +1,221 @@
+"""Tests for SnapshotManager and ChangelogMonitor."""
+
+import gzip
+import hashlib
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import ANY
+
+import pytest
+
+from config import Config, RepositoryConfig, TranslationConfig
+from fetcher import HASH_ALGO, Fetcher, FetchResult
+from monitor import ChangelogMonitor, NoChangesError, SnapshotManager
+
+
+def fetch_result(content, etag=None):
+    """A 200 response as Fetcher would return it."""
+    content_hash = hashlib.blake2b(content.encode("utf-8"), digest_size=32).hexdigest()
+    return FetchResult(content=content, status_code=200, content_hash=content_hash, etag=etag)
+
+
+class StubFetcher(Fetcher):
+    """Serves canned results instead of hitting GitHub; extract_diff is the real one."""
+
+    def __init__(self):
+        super().__init__()
+        self.result = None
+        self.diffs = 0
+
+    def fetch_changelog(self, owner, repo, file_path, branch="main", etag=None, last_modified=None):
+        return self.result
+
+    def extract_diff(self, current, previous, max_lines=50):
+        self.diffs += 1
+        return super().extract_diff(current, previous, max_lines)
+
+
+@pytest.fixture
+def manager(tmp_path):
+    return SnapshotManager(str(tmp_path / "snapshots"))
+
+
+@pytest.fixture
+def monitor(manager):
+    # Skip __init__: it reads the config file and needs API keys
+    instance = ChangelogMonitor.__new__(ChangelogMonitor)
+    instance.logger = logging.getLogger(__name__)
+    instance.snapshot_manager = manager
+    instance.fetcher = StubFetcher()
+    return instance
+
+
+@pytest.fixture
+def repo_config():
+    return RepositoryConfig(name="A", owner="o", repo="a", file="CHANGELOG.md")
+
+
+def test_unchanged_hash_skips_diff(monitor, manager, repo_config):
+    content = "## 1.0\n- a"
+    result = fetch_result(content)
+    manager.save_snapshot("o", "a", "CHANGELOG.md", "main", content, result.content_hash)
+    monitor.fetcher.result = result
+
+    with pytest.raises(NoChangesError):
+        monitor._check_repository(repo_config)
+
+    assert monitor.fetcher.diffs == 0
+
+
+def test_change_without_new_lines_becomes_baseline(monitor, manager, repo_config):
+    manager.save_snapshot("o", "a", "CHANGELOG.md", "main", "## 1.0\n- old a\n- old b", "h0")
+
+    # A deletion yields no diff, but the shorter file becomes the new baseline
+    monitor.fetcher.result = fetch_result("## 1.0\n- old a")
+    with pytest.raises(NoChangesError):
+        monitor._check_repository(repo_config)
+
+    assert manager.load_content("o", "a", "CHANGELOG.md", "main") == "## 1.0\n- old a"
+
+    monitor.fetcher.result = fetch_result("## 1.1\n- new\n\n## 1.0\n- old a")
+    change = monitor._check_repository(repo_config)
+
+    assert change.diff == "## 1.1\n- new\n"
+
+
+def rewrite_snapshot(manager, **fields):
+    """Edit the stored snapshot as an older version of the monitor would have written it."""
+    path = manager.get_snapshot_path("o", "a", "CHANGELOG.md", "main")
+    snapshot = json.loads(path.read_text(encoding="utf-8"))
+    snapshot.update(fields)
+    snapshot = {key: value for key, value in snapshot.items() if value is not None}
+    path.write_text(json.dumps(snapshot), encoding="utf-8")
+    manager._snapshots.clear()
+
+
+def test_sha256_snapshot_is_migrated_without_a_change(monitor, manager, repo_config):
+    content = "## 1.0\n- a"
+    manager.save_snapshot("o", "a", "CHANGELOG.md", "main", content, "unused")
+    sha256 = hashlib.sha256(content.encode("utf-8")).hexdigest()
+    rewrite_snapshot(manager, content_hash=sha256, hash_algo=None)
+    monitor.fetcher.result = fetch_result(content)
+
+    with pytest.raises(NoChangesError):
+        monitor._check_repository(repo_config)
+
+    snapshot = manager.load_snapshot("o", "a", "CHANGELOG.md", "main")
+    assert snapshot["hash_algo"] == HASH_ALGO
+    assert snapshot["content_hash"] == monitor.fetcher.result.content_hash
+
+
+def test_unknown_hash_algo_counts_as_a_change(monitor, manager, repo_config):
+    content = "## 1.1\n- b\n## 1.0\n- a"
+    manager.save_snapshot("o", "a", "CHANGELOG.md", "main", "## 1.0\n- a", "unused")
+    # Even a hash that happens to match as SHA-256 must not be read as one
+    sha256 = hashlib.sha256(content.encode("utf-8")).hexdigest()
+    rewrite_snapshot(manager, content_hash=sha256, hash_algo="blake3")
+    monitor.fetcher.result = fetch_result(content)
+
+    change = monitor._check_repository(repo_config)
+
+    assert change.diff == "## 1.1\n- b"
+
+
+def test_branches_and_colliding_names_get_separate_snapshots(manager, tmp_path):
+    keys = [
+        ("o", "a", "CHANGELOG.md", "main"),
+        ("o", "a", "CHANGELOG.md", "release/1.0"),
+        # Same name as above once "/" is replaced
+        ("o", "a", "CHANGELOG.md", "release_1.0"),
+        ("o", "a", "docs/CHANGELOG.md", "main"),
+    ]
+    for index, key in enumerate(keys):
+        manager.save_snapshot(*key, f"content {index}", f"hash {index}")
+
+    assert len({manager.get_snapshot_path(*key) for key in keys}) == len(keys)
+
+    reloaded = SnapshotManager(str(tmp_path / "snapshots"))
+    for index, key in enumerate(keys):
+        assert reloaded.load_snapshot(*key)["content_hash"] == f"hash {index}"
+        assert reloaded.load_content(*key) == f"content {index}"
+
+
+def write_legacy_snapshot(manager, branch="main"):
+    """A snapshot as written before file names included branch and file."""
+    snapshot = {
+        "repository": {"owner": "o", "repo": "a", "file": "CHANGELOG.md", "branch": branch},
+        "content_hash": "legacy",
+        "hash_algo": HASH_ALGO,
+    }
+    (manager.snapshots_dir / "o_a_CHANGELOG.json").write_text(json.dumps(snapshot), encoding="utf-8")
+    (manager.snapshots_dir / "o_a_CHANGELOG.txt.gz").write_bytes(gzip.compress(b"## 1.0"))
+
+
+def test_legacy_snapshot_is_adopted_by_the_matching_entry(manager):
+    write_legacy_snapshot(manager)
+
+    assert manager.load_snapshot("o", "a", "CHANGELOG.md", "dev") is None
+    assert (manager.snapshots_dir / "o_a_CHANGELOG.json").exists()
+
+    assert manager.load_snapshot("o", "a", "CHANGELOG.md", "main")["content_hash"] == "legacy"
+    assert manager.load_content("o", "a", "CHANGELOG.md", "main") == "## 1.0"
+    assert not (manager.snapshots_dir / "o_a_CHANGELOG.json").exists()
+    assert not (manager.snapshots_dir / "o_a_CHANGELOG.txt.gz").exists()
+
+
+def test_parallel_entries_migrate_legacy_snapshot_cleanly(manager, caplog):
+    write_legacy_snapshot(manager)
+    branches = ["main", *(f"branch-{i}" for i in range(15))]
+
+    with caplog.at_level(logging.ERROR), ThreadPoolExecutor(max_workers=len(branches)) as executor:
+        snapshots = dict(
+            zip(branches, executor.map(lambda b: manager.load_snapshot("o", "a", "CHANGELOG.md", b), branches))
+        )
+
+    assert caplog.records == []
+    assert snapshots.pop("main")["content_hash"] == "legacy"
+    assert set(snapshots.values()) == {None}
+
+
+class StubTranslator:
+    def __init__(self):
+        self.batches = []
+
+    def translate_batch(self, items):
+        self.batches.append(items)
+        return [f"translated {text}" for _, text in items]
+
+
+class StubNotifier:
+    def __init__(self):
+        self.sent = []
+
+    def send(self, repo_name, content, repo_url):
+        self.sent.append((repo_name, content))
+        return True
+
+    def close(self):
+        pass
+
+
+def test_run_translates_identical_diffs_once(monitor, manager):
+    monitor.config = Config(
+        translation=TranslationConfig(model="m"),
+        repositories=[
+            RepositoryConfig(name=name, owner="o", repo="a", file="CHANGELOG.md", branch=branch)
+            for name, branch in [("A main", "main"), ("A next", "next"), ("B", "other")]
+        ],
+    )
+    monitor.translator = StubTranslator()
+    monitor.notifier = StubNotifier()
+    monitor.fetcher.result = fetch_result("## 1.0\n- Same release notes on every branch")
+
+    monitor.run()
+
+    assert monitor.translator.batches == [[(ANY, "## 1.0\n- Same release notes on every branch")]]
+    assert sorted(monitor.notifier.sent) == [
+        (name, "translated ## 1.0\n- Same release notes on every branch") for name in ["A main", "A next", "B"]
+    ]
+    for branch in ["main", "next", "other"]:
+        assert manager.load_snapshot("o", "a", "CHANGELOG.md", branch) is not None
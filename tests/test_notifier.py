@@ -0,0 +1,60 @@
+"""Tests for Notifier.truncate_message."""
+
+import random
+
+import pytest
+
+from notifier import Notifier
+
+SUFFIX = "...(続きはリンク先で)"
+
+
+@pytest.fixture
+def notifier():
+    return Notifier(webhook_url="https://discord.invalid/webhook")
+
+
+def reference_truncate(text, max_length):
+    """The original two-rfind implementation."""
+    if len(text) <= max_length:
+        return text
+    truncated = text[:max_length]
+    last_newline = truncated.rfind("\n")
+    if last_newline > max_length * 0.7:
+        truncated = truncated[:last_newline]
+    else:
+        last_space = truncated.rfind(" ")
+        if last_space > max_length * 0.7:
+            truncated = truncated[:last_space]
+    return truncated + SUFFIX
+
+
+def test_short_text_unchanged(notifier):
+    assert notifier.truncate_message("hello", max_length=10) == "hello"
+
+
+def test_prefers_newline_over_later_space(notifier):
+    text = "a" * 9 + "\n" + "b c" + "d" * 20
+
+    assert notifier.truncate_message(text, max_length=12) == "a" * 9 + SUFFIX
+
+
+def test_falls_back_to_space(notifier):
+    text = "a" * 8 + " " + "b" * 20
+
+    assert notifier.truncate_message(text, max_length=10) == "a" * 8 + SUFFIX
+
+
+def test_ignores_breaks_before_last_30_percent(notifier):
+    text = "a\n" + "b" * 20
+
+    assert notifier.truncate_message(text, max_length=10) == "a\n" + "b" * 8 + SUFFIX
+
+
+def test_matches_reference_implementation(notifier):
+    rng = random.Random(0)
+    for _ in range(2000):
+        max_length = rng.randint(1, 60)
+        text = "".join(rng.choice("ab \nxx") for _ in range(rng.randint(0, 100)))
+
+        assert notifier.truncate_message(text, max_length) == reference_truncate(text, max_length)
@@ -0,0 +1,151 @@
+"""Tests for Translator."""
+
+import json
+import os
+from types import SimpleNamespace
+
+import pytest
+
+from translator import Translator
+
+FIX = "- Fixed a crash when opening large files"
+ADD = "- Added support for dark mode in the settings page"
+
+
+class StubModels:
+    """Answers generate_content from a queue of canned response texts."""
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.prompts = []
+
+    def generate_content(self, model, contents, config):
+        self.prompts.append(contents)
+        return SimpleNamespace(text=self.responses.pop(0))
+
+
+class StubClient:
+    def __init__(self, *responses):
+        self.models = StubModels(responses)
+
+
+@pytest.fixture
+def translator(tmp_path):
+    return Translator(api_key="test-key", cache_dir=str(tmp_path / "cache"))
+
+
+def test_mask_replaces_protected_spans(translator):
+    text = "## v2.0.1\n- Fixed `foo --bar`, see [docs](https://example.com/a).\n```\ncode\n```"
+
+    masked, protected = translator._mask(text)
+
+    assert masked == "## ⟦C0⟧\n- Fixed ⟦C1⟧, see [docs](⟦C2⟧).\n⟦C3⟧"
+    assert protected == ["v2.0.1", "`foo --bar`", "https://example.com/a", "```\ncode\n```"]
+
+
+def test_unmask_round_trip(translator):
+    text = "- Bump to 1.2.3 via `npm i` (https://example.com)"
+
+    masked, protected = translator._mask(text)
+
+    assert translator._unmask(masked, protected) == text
+
+
+def test_unmask_after_translation(translator):
+    _, protected = translator._mask("- Fixed `foo` in v1.0.0")
+
+    assert translator._unmask("- ⟦C1⟧ の ⟦C0⟧ を修正", protected) == "- v1.0.0 の `foo` を修正"
+
+
+def test_unmask_leaves_unknown_placeholders(translator):
+    assert translator._unmask("⟦C5⟧", ["x"]) == "⟦C5⟧"
+
+
+def test_batch_uses_one_request(translator):
+    translator.client = StubClient(json.dumps({"0": "- 修正", "1": "- 追加"}))
+
+    results = translator.translate_batch([("A", FIX), ("B", ADD)])
+
+    assert results == ["- 修正", "- 追加"]
+    assert len(translator.client.models.prompts) == 1
+
+
+def test_batch_keeps_same_named_items_apart(translator):
+    translator.client = StubClient(json.dumps({"0": "- 修正", "1": "- 追加"}))
+
+    assert translator.translate_batch([("A", FIX), ("A", ADD)]) == ["- 修正", "- 追加"]
+
+
+@pytest.mark.parametrize("response", ["[1]", '"text"', "not json"])
+def test_batch_falls_back_when_response_is_not_an_object(translator, response):
+    translator.client = StubClient(response, "- 修正", "- 追加")
+
+    results = translator.translate_batch([("A", FIX), ("B", ADD)])
+
+    assert results == ["- 修正", "- 追加"]
+    assert len(translator.client.models.prompts) == 3
+
+
+def test_batch_falls_back_for_missing_items(translator):
+    translator.client = StubClient(json.dumps({"0": "- 修正"}), "- 追加")
+
+    assert translator.translate_batch([("A", FIX), ("B", ADD)]) == ["- 修正", "- 追加"]
+
+
+def test_version_only_diff_is_trivial(translator):
+    assert translator._is_trivial("## v1.2.4\n")
+
+
+def test_code_and_urls_are_not_prose(translator):
+    assert translator._is_trivial("## 1.0\n- https://example.com/x\n```\nlots of code in a block\n```")
+
+
+def test_prose_is_not_trivial(translator):
+    assert not translator._is_trivial("## 1.0\n- Fixed a crash when opening files")
+
+
+def test_trivial_diff_is_not_sent(translator):
+    translator.client = StubClient()
+
+    assert translator.translate("## v1.2.4\n", "A") == "## v1.2.4\n"
+    assert translator.translate_batch([("A", "## v1.2.4"), ("B", "")]) == ["## v1.2.4", ""]
+    assert translator.client.models.prompts == []
+
+
+def test_cache_persists_across_instances(translator, tmp_path):
+    translator.client = StubClient("- 修正")
+    assert not translator.cache_dir.exists()
+
+    assert translator.translate(FIX, "A") == "- 修正"
+
+    again = Translator(api_key="test-key", cache_dir=str(tmp_path / "cache"))
+    again.client = StubClient()
+    assert again.translate(FIX, "A") == "- 修正"
+    assert again.client.models.prompts == []
+
+
+def test_batch_shares_cache_with_single_requests(translator):
+    translator.client = StubClient("- 修正", "- 追加")
+    translator.translate(FIX, "A")
+
+    # Only the uncached item is left, so it is sent as a single request
+    assert translator.translate_batch([("A", FIX), ("B", ADD)]) == ["- 修正", "- 追加"]
+    assert len(translator.client.models.prompts) == 2
+
+    translator.client = StubClient()
+    assert translator.translate_batch([("A", FIX)]) == ["- 修正"]
+
+
+def test_prune_evicts_least_recently_used(translator):
+    for index, prompt in enumerate(["old", "used", "new"]):
+        translator._cache_set(prompt, "x" * 10)
+        os.utime(translator._cache_path(prompt), (index, index))
+
+    # Reading an entry makes it the most recently used
+    assert translator._cache_get("old") == "x" * 10
+    translator.cache_size_limit = 25
+    translator._prune_cache()
+
+    assert translator._cache_get("old") is not None
+    assert translator._cache_get("used") is None
+    assert translator._cache_get("new") is not None